@@ -25,70 +25,70 @@
 #
 
 import argparse
-import configparser
 import re
+import sys
+import traceback
 
+from datafile import read_data_file
 
-def assertIn(element, l):
-    if element not in l:
-        raise AssertionError('{} must be in {}'.format(element, l))
+# Splits a ;-separated list, skipping empty entries (e.g. a trailing ;)
+LIST_ENTRY_REGEX = re.compile(r'[^;]+')
 
+DEVICE_MATCH_REGEX = re.compile(r'(usb|bluetooth):[0-9a-f]{4}:[0-9a-f]{4}')
 
-def assertNotIn(element, l):
-    if element in l:
-        raise AssertionError('{} must not be in {}'.format(element, l))
+# min:max@steps in canonical form, i.e. no leading zeros and no trailing
+# zeros after the decimal point (50, not 50.0)
+DPI_RANGE_REGEX = re.compile(r'(0|[1-9][0-9]*):(0|[1-9][0-9]*)@((?:0|[1-9][0-9]*)(?:\.[0-9]*[1-9])?)')
 
+# Any of these characters in a data file name will throw an error. Currently
+# only tests the square brackets [], parentheses, and curly braces.
+ILLEGAL_CHARACTERS = '[](){}'
 
-def check_match_str(string):
-    bustypes = ['usb', 'bluetooth']
+DEVICE_REQUIRED_KEYS = frozenset(['Name', 'Driver', 'DeviceMatch'])
+DEVICE_PERMITTED_KEYS = DEVICE_REQUIRED_KEYS | frozenset(['LedTypes'])
 
-    matches = string.split(';')
-    for match in matches:
-        if not match:  # empty string if trailing ;
-            continue
+LED_TYPES = frozenset(['logo', 'side', 'battery', 'dpi', 'switches'])
 
-        parts = match.split(':')
-        assert(len(parts) == 3)
-        assertIn(parts[0], bustypes)
-        vid = parts[1]
-        assert(vid == '{:04x}'.format(int(vid, 16)))
-        pid = parts[2]
-        assert(pid == '{:04x}'.format(int(pid, 16)))
+PROFILE_TYPES = frozenset(['G9', 'G500', 'G700'])
 
 
-def check_ledtypes_str(string):
-    permitted_types = ['logo', 'side', 'battery', 'dpi', 'switches']
+def assertIn(element, l):
+    if element not in l:
+        raise AssertionError('{} must be in {}'.format(element, l))
 
-    types = string.split(';')
-    for t in types:
-        if not t:  # emtpy string if trailing ;
-            continue
 
-        assertIn(t, permitted_types)
+def assertAllIn(elements, permitted):
+    unknown = set(elements) - permitted
+    if unknown:
+        raise AssertionError('{} must be in {}'.format(sorted(unknown), sorted(permitted)))
 
 
-def check_section_device(section):
-    required_keys = ['Name', 'Driver', 'DeviceMatch']
-    permitted_keys = required_keys + ['LedTypes']
+def check_match_str(string):
+    for match in LIST_ENTRY_REGEX.findall(string):
+        # bustype:vid:pid with vid and pid as 4-digit lowercase hex
+        assert(DEVICE_MATCH_REGEX.fullmatch(match) is not None)
 
-    for key in section.keys():
-        assertIn(key, permitted_keys)
 
-    for r in required_keys:
-        assertIn(r, section)
+def check_ledtypes_str(string):
+    assertAllIn(LIST_ENTRY_REGEX.findall(string), LED_TYPES)
 
-    try:
-        check_ledtypes_str(section['LedTypes'])
-    except KeyError:
-        pass
+
+def check_section_device(section):
+    keys = set(section)
+    unknown = keys - DEVICE_PERMITTED_KEYS
+    missing = DEVICE_REQUIRED_KEYS - keys
+    if unknown or missing:
+        raise AssertionError('unknown keys {}, missing keys {}'.format(sorted(unknown), sorted(missing)))
+
+    ledtypes = section.get('LedTypes')
+    if ledtypes is not None:
+        check_ledtypes_str(ledtypes)
 
     check_match_str(section['DeviceMatch'])
 
 
 def check_dpi_range_str(string):
-    import re
-
-    m = re.search('^([0-9]+):([0-9]+)@([0-9.]+)$', string)
+    m = DPI_RANGE_REGEX.fullmatch(string)
     assert(m is not None)
     min = int(m.group(1))
     max = int(m.group(2))
@@ -98,130 +98,136 @@ def check_dpi_range_str(string):
     assert(max >= 2000 and max <= 12000)
     assert(steps > 0 and steps <= 100)
 
-    if int(steps) == steps:
-        steps = int(steps)
-
-    assert(string == '{}:{}@{}'.format(min, max, steps))
-
 
 def check_dpi_list_str(string):
     entries = string.split(';')
     # Remove possible empty last entry if trailing with a ;
-    if not entries[len(entries) - 1]:
+    if not entries[-1]:
         entries = entries[:-1]
 
-    for idx, entry in enumerate(entries):
+    # DPIs must be within [0, 12000] and strictly increasing
+    prev = -1
+    for entry in entries:
         dpi = int(entry)
-        assert(dpi >= 0 and dpi <= 12000)
-        if idx > 0:
-            prev = entries[idx - 1]
-            prev_dpi = int(prev)
-            assert(dpi > prev_dpi)
+        assert(dpi > prev and dpi <= 12000)
+        prev = dpi
 
 
 def check_profile_type_str(string):
-    types = ['G9', 'G500', 'G700']
-    assertIn(string, types)
+    assertIn(string, PROFILE_TYPES)
 
 
-def check_section_hidpp10(section):
-    permitted = ['Profiles', 'ProfileType', 'DpiRange', 'DpiList', 'DeviceIndex', 'Leds']
-    for key in section.keys():
-        assertIn(key, permitted)
+def check_profiles_str(string):
+    nprofiles = int(string)
+    # 10 is arbitrarily chosen
+    assert(nprofiles > 0 and nprofiles < 10)
 
-    try:
-        nprofiles = int(section['Profiles'])
-        # 10 is arbitrarily chosen
-        assert(nprofiles > 0 and nprofiles < 10)
-    except KeyError:
-        pass
 
-    try:
-        index = int(section['DeviceIndex'], 16)
-        assert(index > 0 and index <= 0xff)
-    except KeyError:
-        pass
+def check_device_index_str(string):
+    index = int(string, 16)
+    assert(index > 0 and index <= 0xff)
 
-    try:
-        check_dpi_range_str(section['DpiRange'])
-        assertNotIn('DpiList', section.keys())
-    except KeyError:
-        pass
 
-    try:
-        check_dpi_list_str(section['DpiList'])
-        assertNotIn('DpiRange', section.keys())
-    except KeyError:
-        pass
+def check_leds_str(string):
+    leds = int(string)
+    # 10 is arbitrarily chosen
+    assert(leds > 0 and leds < 10)
 
-    try:
-        check_profile_type_str(section['ProfileType'])
-    except KeyError:
-        pass
 
-    try:
-        leds = int(section['Leds'])
-        # 10 is arbitrarily chosen
-        assert(leds > 0 and leds < 10)
-    except KeyError:
-        pass
+# The keys permitted in each driver's section, mapped to the check for their
+# value or None if the value isn't checked
+DRIVER_SECTION_KEYS = {
+    'hidpp10': {
+        'Profiles': check_profiles_str,
+        'ProfileType': check_profile_type_str,
+        'DpiRange': check_dpi_range_str,
+        'DpiList': check_dpi_list_str,
+        'DeviceIndex': check_device_index_str,
+        'Leds': check_leds_str,
+    },
+    'hidpp20': {
+        'DeviceIndex': check_device_index_str,
+        'Leds': None,
+        'Quirk': None,
+    },
+}
 
+# Pairs of keys that cannot be used together in a driver section
+EXCLUSIVE_KEYS = [
+    ('DpiRange', 'DpiList'),
+]
 
-def check_section_hidpp20(section):
-    permitted = ['DeviceIndex', 'Leds', 'Quirk']
-    for key in section.keys():
-        assertIn(key, permitted)
 
-    try:
-        index = int(section['DeviceIndex'], 16)
-        assert(index > 0 and index <= 0xff)
-    except KeyError:
-        pass
+def check_section_driver(driver, section):
+    # Sections of drivers without an entry here are not validated
+    key_checks = DRIVER_SECTION_KEYS.get(driver)
+    if key_checks is None:
+        return
 
+    assertAllIn(section, key_checks.keys())
 
-def check_section_driver(driver, section):
-    if driver == 'hidpp10':
-        check_section_hidpp10(section)
-    elif driver == 'hidpp20':
-        check_section_hidpp20(section)
-    else:
-        assert('Unsupported driver section {}'.format(driver))
+    for key1, key2 in EXCLUSIVE_KEYS:
+        if key1 in section and key2 in section:
+            raise AssertionError('{} and {} are mutually exclusive'.format(key1, key2))
+
+    for key, value in section.items():
+        check = key_checks[key]
+        if check is not None:
+            check(value)
 
 
 def validate_data_file_name(path):
-    # Matching any of the characters in the regular expression will throw an
-    # error. Currently only tests the square brackets [], parentheses, and curly
-    # braces.
-    illegal_characters_regex = '([\[\]\{\}\(\)])'
-    found_characters = re.findall(illegal_characters_regex, path)
+    found_characters = [c for c in ILLEGAL_CHARACTERS if c in path]
     if found_characters:
         raise AssertionError("data file name '{}' contains illegal characters: '{}'".format(path, ''.join(found_characters)))
 
-def parse_data_file(path):
-    print('Parsing file {}'.format(path))
-    data = configparser.ConfigParser(strict=True)
-    # Don't convert to lowercase
-    data.optionxform = lambda option: option
-    data.read(path)
 
-    assertIn('Device', data.sections())
-    check_section_device(data['Device'])
+def parse_data_file(path, quiet=False):
+    if not quiet:
+        print('Parsing file {}'.format(path))
+    data = read_data_file(path)
+
+    # Snapshot the sections into plain dicts, the checks below look keys up
+    # repeatedly and don't need ConfigParser's per-lookup machinery
+    sections = {s: dict(data[s]) for s in data.sections()}
+
+    assertIn('Device', sections)
+    device = sections['Device']
+    check_section_device(device)
 
-    driver = data['Device']['Driver']
+    driver = device['Driver']
     driver_section = 'Driver/{}'.format(driver)
 
-    permitted_sections = ['Device', driver_section]
-    for s in data.sections():
-        assertIn(s, permitted_sections)
+    assertAllIn(sections, frozenset(['Device', driver_section]))
 
-    if data.has_section(driver_section):
-        check_section_driver(driver, data[driver_section])
+    if driver_section in sections:
+        check_section_driver(driver, sections[driver_section])
+
+
+def check_data_file(path, quiet=False):
+    # Returns the traceback of the failed check, or None if the file is
+    # valid
+    try:
+        validate_data_file_name(path)
+        parse_data_file(path, quiet)
+    except Exception:
+        return traceback.format_exc()
+    return None
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Device data-file checker")
+    parser.add_argument('--quiet', action='store_true',
+                        help='do not print the name of each file parsed')
     parser.add_argument('file', nargs='+')
     args = parser.parse_args()
+    # Report every invalid file rather than just the first one
+    failed = False
     for path in args.file:
-        validate_data_file_name(path)
-        parse_data_file(path)
+        error = check_data_file(path, args.quiet)
+        if error is not None:
+            print('Invalid data file {}:\n{}'.format(path, error), file=sys.stderr)
+            failed = True
+
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+#
+# Copyright © 2018 Red Hat, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice (including the next
+# paragraph) shall be included in all copies or substantial portions of the
+# Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+#
+# Helpers shared by the device data-file check scripts
+#
+
+import configparser
+
+
+def read_data_file(path):
+    # A fresh parser per file: clear() keeps [DEFAULT], whose keys would
+    # leak into every file read afterwards
+    data = configparser.ConfigParser(strict=True, interpolation=None)
+    # Don't convert to lowercase
+    data.optionxform = str
+    data.read(path)
+    return data
+
+
+def parse_device_matches(path):
+    # Only DeviceMatch is needed, so scan for it and stop there rather than
+    # parsing the whole file. The file format itself is validated by
+    # data-parse-test.py.
+    in_device = False
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('['):
+                if in_device:
+                    break
+                in_device = line == '[Device]'
+            elif in_device:
+                key, sep, value = line.partition('=')
+                if sep and key.rstrip() == 'DeviceMatch':
+                    return value.strip().split(';')
+
+    raise KeyError('DeviceMatch')
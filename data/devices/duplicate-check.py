@@ -25,17 +25,8 @@
 import argparse
 import os
 import sys
-import configparser
 
-
-def parse_data_file(path):
-    data = configparser.ConfigParser(strict=True)
-    # Don't convert to lowercase
-    data.optionxform = lambda option: option
-    data.read(path)
-
-    matches = data['Device']['DeviceMatch']
-    return matches.split(';')
+from datafile import parse_device_matches
 
 
 if __name__ == "__main__":
@@ -45,7 +36,7 @@ if __name__ == "__main__":
     device_matches = {}
     duplicates = False
     for path in args.file:
-        matches = parse_data_file(path)
+        matches = parse_device_matches(path)
         fname = os.path.basename(path)
         for m in matches:
             if m in device_matches:
@@ -25,7 +25,8 @@
 import argparse
 import os
 import sys
-import configparser
+
+from datafile import parse_device_matches
 
 # see the IDs from
 # https://github.com/torvalds/linux/blob/master/drivers/hid/hid-ids.h#L772
@@ -44,17 +45,7 @@ logitech_receivers = [
     0xc53f,  # USB_DEVICE_ID_LOGITECH_NANO_RECEIVER_LIGHTSPEED_1_1
     0xc53a,  # USB_DEVICE_ID_LOGITECH_NANO_RECEIVER_POWERPLAY
 ]
-RECEIVERS = ['usb:046d:{}'.format(r) for r in logitech_receivers]
-
-
-def parse_data_file(path):
-    data = configparser.ConfigParser(strict=True)
-    # Don't convert to lowercase
-    data.optionxform = lambda option: option
-    data.read(path)
-
-    matches = data['Device']['DeviceMatch']
-    return matches.split(';')
+RECEIVERS = frozenset('usb:046d:{:04x}'.format(r) for r in logitech_receivers)
 
 
 if __name__ == "__main__":
@@ -63,12 +54,11 @@ if __name__ == "__main__":
     args = parser.parse_args()
     receiver_found = False
     for path in args.file:
-        matches = parse_data_file(path)
+        matches = parse_device_matches(path)
         fname = os.path.basename(path)
-        for m in matches:
-            if m in RECEIVERS:
-                print('Receiver ID {} found in file {}'.format(m, fname))
-                receiver_found = True
+        for m in sorted(RECEIVERS.intersection(matches)):
+            print('Receiver ID {} found in file {}'.format(m, fname))
+            receiver_found = True
 
     if receiver_found:
         sys.exit(1)
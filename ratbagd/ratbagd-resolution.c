@@ -252,14 +252,16 @@ ratbagd_resolution_set_resolution(sd_bus *bus,
 		r = ratbag_resolution_set_dpi(resolution->lib_resolution, xres);
 	}
 
-	if (r == 0) {
-		sd_bus *bus = sd_bus_message_get_bus(m);
-		sd_bus_emit_properties_changed(bus,
-					       resolution->path,
-					       RATBAGD_NAME_ROOT ".Resolution",
-					       "Resolution",
-					       NULL);
-	}
+	/* libratbag refused the resolution, fail the Set so the client
+	 * doesn't keep a value the device doesn't have */
+	if (r < 0)
+		return -EINVAL;
+
+	sd_bus_emit_properties_changed(sd_bus_message_get_bus(m),
+				       resolution->path,
+				       RATBAGD_NAME_ROOT ".Resolution",
+				       "Resolution",
+				       NULL);
 
 	return 0;
 }
@@ -12,10 +12,19 @@
 #
 
 import bs4
+import concurrent.futures
 import os
 import re
 import sys
 
+# the summary table row holding the source file
+FILE_ROW_LABEL = 'File:'
+# comment marker used in the code to flag a known false positive
+IGNORE_MARKER = 'ignore_clang_sa_'
+# below this many reports, starting the worker processes costs more than
+# parsing the reports in this one
+PARALLEL_THRESHOLD = 32
+
 
 class Bug(object):
     def __init__(self):
@@ -25,6 +34,71 @@ class Bug(object):
         self.sa_descr = None
 
 
+LINE_RE = re.compile(r'line (\d+), column (\d+)')
+
+
+def parse_report(path):
+    """
+    Parse one scan-build report, returns a tuple of the Bug and whether
+    it is marked as ignored in the code.
+    """
+    with open(path) as f:
+        soup = bs4.BeautifulSoup(f, 'lxml')
+
+    # the first table is the summary
+    summary = soup.table
+    bug = Bug()
+
+    # iterate over the table
+    for tr in summary('tr'):
+        if FILE_ROW_LABEL in tr.contents[0].string:
+            bug.cfile = os.path.abspath(tr.contents[1].string)
+        else:
+            bug.sa_type = tr.contents[0].string.rstrip(':').lower()
+            for s in tr.contents[1].strings:
+                # retrieve the line number and the description
+                m = LINE_RE.match(s)
+                if m is None:
+                    # plain str, the bs4 string drags its tree along when
+                    # pickled back to the parent process
+                    bug.sa_descr = str(s)
+                else:
+                    bug.line_number = int(m.group(1))
+
+    # retrieve the html line corresponding to the code
+    code = soup.find('td', id=f'LN{bug.line_number}').parent
+
+    # fetching any comments in this line
+    try:
+        comments = code.find('span', class_='comment').string
+    except AttributeError:
+        # no comments on the line
+        return bug, False
+
+    return bug, IGNORE_MARKER in comments
+
+
+def parse_reports(paths):
+    """
+    Parse all reports, in worker processes if there are enough of them.
+    Returns the list of parse_report() results, in the order of paths.
+    """
+    executor = None
+    if len(paths) >= PARALLEL_THRESHOLD:
+        try:
+            executor = concurrent.futures.ProcessPoolExecutor()
+        except (ImportError, NotImplementedError, OSError):
+            # no working sem_open, e.g. in some build sandboxes
+            pass
+
+    if executor is None:
+        return [parse_report(path) for path in paths]
+
+    # the reports are independent of each other, parse them in parallel
+    with executor:
+        return list(executor.map(parse_report, paths, chunksize=16))
+
+
 def main(argv):
     if len(argv) < 2:
         print(f'usage {argv[0]} PATH')
@@ -35,48 +109,21 @@ def main(argv):
     ignored = []
     bugs = []
 
-    line_re = re.compile(r'line (\d+), column (\d+)')
-
-    for root, dirs, files in os.walk(scanbuild_path):
-        for filename in files:
-            if not filename.startswith('report'):
-                continue
-
-            with open(os.path.join(root, filename)) as f:
-                soup = bs4.BeautifulSoup(f, 'html.parser')
-
-                # the first table is the summary
-                summary = soup.table
-                bug = Bug()
-
-                # iterate over the table
-                for tr in summary('tr'):
-                    if 'File:' in tr.contents[0].string:
-                        bug.cfile = os.path.abspath(tr.contents[1].string)
-                    else:
-                        bug.sa_type = tr.contents[0].string.rstrip(':').lower()
-                        for s in tr.contents[1].strings:
-                            # retrieve the line number and the description
-                            m = line_re.match(s)
-                            if m is None:
-                                bug.sa_descr = s
-                            else:
-                                bug.line_number = int(m.group(1))
-
-                # retrieve the html line corresponding to the code
-                code = soup.find('td', id=f'LN{bug.line_number}').parent
-
-                # fetching any comments in this line
-                try:
-                    comments = code.find('span', class_='comment').string
-                except AttributeError:
-                    # no comments on the line
-                    bugs.append(bug)
-                else:
-                    if 'ignore_clang_sa_' in comments:
-                        ignored.append(bug)
-                    else:
-                        bugs.append(bug)
+    # scan-build puts its reports in a timestamped subdirectory, so this
+    # needs to recurse; os.walk is scandir-based already
+    paths = []
+    for root, dirs, files in os.walk(os.path.abspath(scanbuild_path)):
+        paths.extend(os.path.join(root, f) for f in files if f.startswith('report'))
+
+    # many bugs are in the same source file, share one string per file
+    cfiles = {}
+
+    for bug, is_ignored in parse_reports(paths):
+        bug.cfile = cfiles.setdefault(bug.cfile, bug.cfile)
+        if is_ignored:
+            ignored.append(bug)
+        else:
+            bugs.append(bug)
 
     if len(ignored) > 0:
         print(f'{len(ignored)} bugs are ignored:')
@@ -23,24 +23,41 @@
 
 import argparse
 import os
+import re
 import stat
 import sys
 
 
+# the import in ratbagctl that the contents of ratbagd.py replace
+IMPORT_RE = re.compile(r'^from ratbagd import .*\n?', re.MULTILINE)
+# the license header and blank lines at the top of ratbagd.py
+HEADER_RE = re.compile(r'(?:#.*\n|[^\S\n]*\n)*')
+
+
 def print_ratbagctl(ratbagctl_path, ratbagd_path, version_string):
-    with open(ratbagctl_path, 'r', encoding='utf-8') as ratbagctl, open(ratbagd_path, 'r', encoding='utf-8') as ratbagd:
-        for line in ratbagctl.readlines():
-            if line.startswith("from ratbagd import "):
-                headers = True
-                for r in ratbagd.readlines():
-                    if not r.startswith('#') and r.strip():
-                        headers = False
-                    if not headers:
-                        print(r.rstrip('\n'))
-            else:
-                if '@version@' in line:
-                    line = line.replace('@version@', version_string)
-                print(line.rstrip('\n'))
+    # Both files are small, read them in one go and splice them with
+    # string operations rather than looking at each line
+    with open(ratbagctl_path, 'r', encoding='utf-8') as ratbagctl:
+        ratbagctl = ratbagctl.read()
+    with open(ratbagd_path, 'r', encoding='utf-8') as ratbagd:
+        ratbagd = ratbagd.read()
+
+    ratbagd = ratbagd[HEADER_RE.match(ratbagd).end():]
+    if ratbagd and not ratbagd.endswith('\n'):
+        ratbagd += '\n'
+
+    m = IMPORT_RE.search(ratbagctl)
+    if m is None:
+        head, tail = '', ratbagctl
+    else:
+        head, tail = ratbagctl[:m.start()], ratbagctl[m.end():]
+    if tail and not tail.endswith('\n'):
+        tail += '\n'
+
+    sys.stdout.write(head.replace('@version@', version_string))
+    if m is not None:
+        sys.stdout.write(ratbagd)
+    sys.stdout.write(tail.replace('@version@', version_string))
 
 
 def main(argv):
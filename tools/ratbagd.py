@@ -66,7 +66,7 @@ class RatbagdIncompatible(Exception):
         super().__init__()
         self.ratbagd_version = ratbagd_version
         self.required_version = required_version
-        self.message = "ratbagd API version is {} but we require {}".format(ratbagd_version, required_version)
+        self.message = f"ratbagd API version is {ratbagd_version} but we require {required_version}"
 
     def __str__(self):
         return self.message
@@ -122,31 +122,43 @@ EXCEPTION_TABLE = {
 }
 
 
+# GVariants are immutable, so all argument-less method calls can share one
+_NO_ARGS = GLib.Variant("()", ())
+
+
+class _PendingWrites(object):
+    """The property writes of one device that were sent to ratbagd but whose
+    reply hasn't arrived yet, see _RatbagdDBus._set_dbus_property."""
+    def __init__(self):
+        self.count = 0
+        self.error = None
+        # The replies are dispatched on this context instead of the
+        # caller's, so waiting for them runs nothing but our own callback.
+        # Created with the first write.
+        self.context = None
+
+
 class _RatbagdDBus(GObject.GObject):
     _dbus = None
 
+    # DBus property -> the GObject properties to notify when a rejected
+    # write of it is rolled back
+    _NOTIFY_ON_ROLLBACK = {}
+
     def __init__(self, interface, object_path):
         super().__init__()
 
-        if _RatbagdDBus._dbus is None:
-            try:
-                _RatbagdDBus._dbus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
-            except GLib.Error as e:
-                raise RatbagdUnavailable(e.message)
-
-        ratbag1 = "org.freedesktop.ratbag1"
-        if os.environ.get('RATBAG_TEST'):
-            ratbag1 = "org.freedesktop.ratbag_devel1"
+        ratbag1 = self._bus_name()
 
         if object_path is None:
             object_path = "/" + ratbag1.replace('.', '/')
 
         self._object_path = object_path
-        self._interface = "{}.{}".format(ratbag1, interface)
+        self._interface = f"{ratbag1}.{interface}"
 
         try:
-            self._proxy = Gio.DBusProxy.new_sync(_RatbagdDBus._dbus,
-                                                 Gio.DBusProxyFlags.NONE,
+            self._proxy = Gio.DBusProxy.new_sync(self._bus(),
+                                                 self._proxy_flags(),
                                                  None,
                                                  ratbag1,
                                                  object_path,
@@ -156,11 +168,57 @@ class _RatbagdDBus(GObject.GObject):
             raise RatbagdUnavailable(e.message)
 
         if self._proxy.get_name_owner() is None:
-            raise RatbagdUnavailable("No one currently owns {}".format(ratbag1))
-
-        self._proxy.connect("g-properties-changed", self._on_properties_changed)
+            raise RatbagdUnavailable(f"No one currently owns {ratbag1}")
+
+        # The proxy fetched all properties with a single GetAll when it was
+        # created. Keep an unpacked copy so that property reads are plain
+        # dict lookups; _on_proxy_properties_changed keeps it up-to-date.
+        self._properties = {name: self._proxy.get_cached_property(name).unpack()
+                            for name in self._proxy.get_cached_property_names()}
+
+        # Shared by all objects of a device, RatbagdDevice hands its own to
+        # its profiles and they hand it to their children
+        self._writes = _PendingWrites()
+        # property -> (serial of the latest write in flight, value to roll
+        # back to if ratbagd rejects it)
+        self._writes_in_flight = {}
+        # The RatbagdProfile this object is part of, if any
+        self._profile = None
+
+        self._proxy.connect("g-properties-changed", self._on_proxy_properties_changed)
         self._proxy.connect("g-signal", self._on_signal_received)
 
+    @staticmethod
+    def _bus():
+        if _RatbagdDBus._dbus is None:
+            try:
+                _RatbagdDBus._dbus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+            except GLib.Error as e:
+                raise RatbagdUnavailable(e.message)
+        return _RatbagdDBus._dbus
+
+    @staticmethod
+    def _bus_name():
+        if os.environ.get('RATBAG_TEST'):
+            return "org.freedesktop.ratbag_devel1"
+        return "org.freedesktop.ratbag1"
+
+    @classmethod
+    def _proxy_flags(cls):
+        # Every proxy that listens to signals adds its own match rule on
+        # the bus; objects that ignore signals don't need one.
+        if cls._on_signal_received is _RatbagdDBus._on_signal_received:
+            return Gio.DBusProxyFlags.DO_NOT_CONNECT_SIGNALS
+        return Gio.DBusProxyFlags.NONE
+
+    def _on_proxy_properties_changed(self, proxy, changed_props, invalidated_props):
+        # Derived classes get the unpacked dict of changed properties
+        changed_props = changed_props.unpack()
+        self._properties.update(changed_props)
+        for property in invalidated_props:
+            self._properties.pop(property, None)
+        self._on_properties_changed(proxy, changed_props, invalidated_props)
+
     def _on_properties_changed(self, proxy, changed_props, invalidated_props):
         # Implement this in derived classes to respond to property changes.
         pass
@@ -169,20 +227,9 @@ class _RatbagdDBus(GObject.GObject):
         # Implement this in derived classes to respond to signals.
         pass
 
-    def _find_object_with_path(self, iterable, object_path):
-        # Find the index of an object in an iterable that whose object path
-        # matches the given object path.
-        for index, obj in enumerate(iterable):
-            if obj._object_path == object_path:
-                return index
-        return -1
-
     def _get_dbus_property(self, property):
         # Retrieves a cached property from the bus, or None.
-        p = self._proxy.get_cached_property(property)
-        if p is not None:
-            return p.unpack()
-        return p
+        return self._properties.get(property)
 
     def _set_dbus_property(self, property, type, value, readwrite=True):
         # Sets a cached property on the bus.
@@ -191,16 +238,120 @@ class _RatbagdDBus(GObject.GObject):
         # org.freedesktop.DBus.Properties.Set we need to wrap that again
         # into a (ssv), where v is our value's variant.
         # args to .Set are "interface name", "function name",  value-variant
-        val = GLib.Variant("{}".format(type), value)
+        val = GLib.Variant(type, value)
         if readwrite:
+            # Messages on a connection are delivered in order, so we don't
+            # need to wait for the reply before sending the next write or
+            # a method call. _flush_writes() collects the replies.
             pval = GLib.Variant("(ssv)", (self._interface, property, val))
-            self._proxy.call_sync("org.freedesktop.DBus.Properties.Set",
-                                  pval, Gio.DBusCallFlags.NO_AUTO_START,
-                                  2000, None)
+            serial, previous = self._writes_in_flight.get(property, (0, self._proxy.get_cached_property(property)))
+            serial += 1
+            self._writes_in_flight[property] = (serial, previous)
+            writes = self._writes
+            if writes.context is None:
+                writes.context = GLib.MainContext.new()
+            writes.count += 1
+            # The reply is dispatched on the thread-default context at the
+            # time of the call
+            writes.context.push_thread_default()
+            try:
+                self._proxy.call("org.freedesktop.DBus.Properties.Set",
+                                 pval, Gio.DBusCallFlags.NO_AUTO_START,
+                                 2000, None, self._on_write_finished,
+                                 (property, serial, val))
+            finally:
+                writes.context.pop_thread_default()
 
         # This is our local copy, so we don't have to wait for the async
         # update
+        self._set_cached_property(property, val)
+
+    def _set_cached_property(self, property, val):
         self._proxy.set_cached_property(property, val)
+        if val is None:
+            self._properties.pop(property, None)
+        else:
+            self._properties[property] = val.unpack()
+
+    def _on_write_finished(self, proxy, result, user_data):
+        property, serial, val = user_data
+        self._writes.count -= 1
+        latest, previous = self._writes_in_flight[property]
+        try:
+            proxy.call_finish(result)
+        except GLib.Error as e:
+            # Keep the first error, it is raised by _flush_writes()
+            if self._writes.error is None:
+                self._writes.error = e
+            # Only the latest write decides what ends up in the cache.
+            # Replies arrive in order, so any earlier one is done by now.
+            if serial == latest:
+                self._set_cached_property(property, previous)
+                for name in self._NOTIFY_ON_ROLLBACK.get(property, ()):
+                    self.notify(name)
+                if self._profile is not None:
+                    self._profile._on_write_rejected()
+        else:
+            # Accepted, a later write that fails rolls back to this value
+            previous = val
+            if self._profile is not None:
+                self._profile._confirm_dirty()
+
+        if serial == latest:
+            del self._writes_in_flight[property]
+        else:
+            self._writes_in_flight[property] = (latest, previous)
+
+    def _flush_writes(self):
+        # Waits for the replies to all property writes of this object's
+        # device sent so far. Raises the error of the first write that
+        # failed, if any.
+        while self._writes.count > 0:
+            self._writes.context.iteration(True)
+
+        error = self._writes.error
+        self._writes.error = None
+        if error is not None:
+            # ratbagd fails the Set with -EINVAL for values libratbag
+            # refuses
+            if error.matches(Gio.DBusError.quark(), Gio.DBusError.INVALID_ARGS):
+                raise RatbagErrorValue(error.message)
+            raise error
+
+    @staticmethod
+    def _dbus_args(type, value):
+        if type:
+            return GLib.Variant(f"({type})", value)
+        return _NO_ARGS
+
+    @staticmethod
+    def _dbus_result(method, res):
+        # Unpacks the result of a method call, raising the RatbagError* for
+        # the error code ratbagd returned, if any.
+        result = res.unpack()[0]  # Result is always a tuple
+        if isinstance(result, int):
+            # ratbagd returns its error codes as "u", so negative codes
+            # arrive wrapped around
+            code = result - (1 << 32) if result >= (1 << 31) else result
+            if code in EXCEPTION_TABLE:
+                raise EXCEPTION_TABLE[code](f"{method} failed: {RatbagErrorCode(code).name}")
+        return result
+
+    @staticmethod
+    def _dbus_error(e):
+        # Returns the exception to pass up for the GLib.Error of a method
+        # call.
+        if e.code == Gio.IOErrorEnum.TIMED_OUT:
+            return RatbagdDBusTimeout(e.message)
+        # Unrecognized error code; print the message to stderr and pass on
+        # the GLib.Error.
+        print(e.message, file=sys.stderr)
+        return e
+
+    def _on_call_succeeded(self):
+        # The methods of profiles and their children all change the profile
+        if self._profile is not None:
+            self._profile._confirm_dirty()
 
     def _dbus_call(self, method, type, *value):
         # Calls a method synchronously on the bus, using the given method name,
@@ -210,25 +361,45 @@ class _RatbagdDBus(GObject.GObject):
         # appropriate RatbagError* or RatbagdDBus* exception, or GLib.Error if
         # it is an unexpected exception that probably shouldn't be passed up to
         # the UI.
-        val = GLib.Variant("({})".format(type), value)
         try:
-            res = self._proxy.call_sync(method, val,
+            res = self._proxy.call_sync(method, self._dbus_args(type, value),
                                         Gio.DBusCallFlags.NO_AUTO_START,
                                         2000, None)
-            if res in EXCEPTION_TABLE:
-                raise EXCEPTION_TABLE[res]
-            return res.unpack()[0]  # Result is always a tuple
         except GLib.Error as e:
-            if e.code == Gio.IOErrorEnum.TIMED_OUT:
-                raise RatbagdDBusTimeout(e.message)
+            raise self._dbus_error(e)
+        result = self._dbus_result(method, res)
+        self._on_call_succeeded()
+        return result
+
+    def _dbus_call_async(self, callback, method, type, *value):
+        # Like _dbus_call(), but returns without waiting for the reply. Once
+        # it arrives, callback(result, error) is invoked from the caller's
+        # thread-default main context, with either the result or the
+        # exception _dbus_call() would have raised.
+        def on_call_finished(proxy, res, user_data=None):
+            try:
+                result = self._dbus_result(method, proxy.call_finish(res))
+            except GLib.Error as e:
+                callback(None, self._dbus_error(e))
+            except RatbagError as e:
+                callback(None, e)
             else:
-                # Unrecognized error code; print the message to stderr and raise
-                # the GLib.Error.
-                print(e.message, file=sys.stderr)
-                raise
+                self._on_call_succeeded()
+                callback(result, None)
+
+        self._proxy.call(method, self._dbus_args(type, value),
+                         Gio.DBusCallFlags.NO_AUTO_START,
+                         2000, None, on_call_finished, None)
 
     def __eq__(self, other):
-        return other and self._object_path == other._object_path
+        if self is other:
+            return True
+        if not isinstance(other, _RatbagdDBus):
+            return NotImplemented
+        return self._object_path == other._object_path
+
+    def __hash__(self):
+        return hash(self._object_path)
 
 
 class Ratbagd(_RatbagdDBus):
@@ -251,28 +422,45 @@ class Ratbagd(_RatbagdDBus):
     def __init__(self, api_version):
         super().__init__("Manager", None)
         result = self._get_dbus_property("Devices")
-        if result is None and not self._proxy.get_cached_property_names():
+        if result is None and not self._properties:
             raise RatbagdUnavailable("Make sure it is running and your user is in the required groups.")
         if self.api_version != api_version:
             raise RatbagdIncompatible(self.api_version or -1, api_version)
         self._devices = [RatbagdDevice(objpath) for objpath in result or []]
+        # Built on demand by __getitem__, dropped whenever a device is added
+        # or removed or changes its id
+        self._devices_by_id = None
+        for device in self._devices:
+            device.connect("notify::id", self._on_device_id_changed)
         self._proxy.connect("notify::g-name-owner", self._on_name_owner_changed)
 
     def _on_name_owner_changed(self, *kwargs):
         self.emit("daemon-disappeared")
 
+    def _on_device_id_changed(self, device, pspec):
+        self._devices_by_id = None
+
     def _on_properties_changed(self, proxy, changed_props, invalidated_props):
-        if "Devices" in changed_props.keys():
-            object_paths = [d._object_path for d in self._devices]
-            for object_path in changed_props["Devices"]:
-                if object_path not in object_paths:
+        if "Devices" in changed_props:
+            object_paths = changed_props["Devices"]
+            current = {d._object_path for d in self._devices}
+            # Not set(): ratbagctl, which this file is merged into, has a
+            # module-level "set" shadowing the builtin
+            incoming = {p for p in object_paths}
+
+            for object_path in object_paths:
+                if object_path not in current:
                     device = RatbagdDevice(object_path)
                     self._devices.append(device)
+                    self._devices_by_id = None
+                    device.connect("notify::id", self._on_device_id_changed)
                     self.emit("device-added", device)
-            for device in self.devices:
-                if device._object_path not in changed_props["Devices"]:
-                    self._devices.remove(device)
-                    self.emit("device-removed", device)
+
+            # Iterate over a copy, we're removing from the list
+            for device in [d for d in self._devices if d._object_path not in incoming]:
+                self._devices.remove(device)
+                self._devices_by_id = None
+                self.emit("device-removed", device)
             self.notify("devices")
 
     @GObject.Property
@@ -286,10 +474,10 @@ class Ratbagd(_RatbagdDBus):
 
     def __getitem__(self, id):
         """Returns the requested device, or None."""
-        for d in self.devices:
-            if d.id == id:
-                return d
-        return None
+        if self._devices_by_id is None:
+            # reversed so that the first device wins if two share an id
+            self._devices_by_id = {d.id: d for d in reversed(self._devices)}
+        return self._devices_by_id.get(id)
 
     def __enter__(self):
         return self
@@ -316,6 +504,7 @@ class RatbagdDevice(_RatbagdDBus):
         result = self._get_dbus_property("Profiles") or []
         self._profiles = [RatbagdProfile(objpath) for objpath in result]
         for profile in self._profiles:
+            profile._writes = self._writes
             profile.connect("notify::is-active", self._on_active_profile_changed)
 
         # Use a SHA1 of our object path as our device's ID
@@ -327,7 +516,7 @@ class RatbagdDevice(_RatbagdDBus):
 
     def _on_active_profile_changed(self, profile, pspec):
         if profile.is_active:
-            self.emit("active-profile-changed", self._profiles[profile.index])
+            self.emit("active-profile-changed", profile)
 
     @GObject.Property
     def id(self):
@@ -364,6 +553,17 @@ class RatbagdDevice(_RatbagdDBus):
         print("No active profile. Please report this bug to the libratbag developers", file=sys.stderr)
         return self._profiles[0]
 
+    def flush(self):
+        """Waits until ratbagd has processed all changes made so far, without
+        committing them to the device. Changes are sent to ratbagd without
+        waiting for a reply, an error for any of them is raised here, as
+        RatbagErrorValue for a value ratbagd refused and as GLib.Error
+        otherwise. A rejected value is reverted to the last accepted one
+        and its property notified. Only this device's changes are waited
+        for.
+        """
+        self._flush_writes()
+
     def commit(self):
         """Commits all changes made to the device.
 
@@ -372,11 +572,31 @@ class RatbagdDevice(_RatbagdDBus):
         by emitting the Resync signal, which automatically resynchronizes the
         device. No further interaction is required by the client.
         """
+        self.flush()
         self._dbus_call("Commit", "")
         for profile in self._profiles:
-            if profile.dirty:
-                profile._dirty = False
-                profile.notify("dirty")
+            profile._clear_dirty()
+
+    def commit_async(self, callback):
+        """Like commit(), but asynchronous, see
+        RatbagdProfile.set_active_async(). Unlike commit(), this doesn't
+        wait for the changes to be accepted before committing. The first
+        change ratbagd rejected is passed to the callback as error, the
+        accepted ones are committed regardless.
+        """
+        def on_finished(result, error):
+            # Writes are answered in order, so all replies to the changes
+            # sent before the Commit are in by now
+            try:
+                self.flush()
+            except (GLib.Error, RatbagError) as e:
+                error = error or e
+            if error is None:
+                for profile in self._profiles:
+                    profile._clear_dirty()
+            callback(result, error)
+
+        self._dbus_call_async(on_finished, "Commit", "")
 
 
 class RatbagdProfile(_RatbagdDBus):
@@ -387,51 +607,111 @@ class RatbagdProfile(_RatbagdDBus):
     CAP_DISABLE = 102
     CAP_WRITE_ONLY = 103
 
+    _NOTIFY_ON_ROLLBACK = {
+        "Name": ("name",),
+        "Enabled": ("enabled",),
+        "ReportRate": ("report-rate",),
+    }
+
     def __init__(self, object_path):
         super().__init__("Profile", object_path)
+        self._profile = self
         self._dirty = False
+        # Whether the profile is dirty because of something other than
+        # writes that ratbagd may still reject
+        self._dirty_confirmed = False
+        self._capabilities = frozenset(self._get_dbus_property("Capabilities") or [])
         self._active = self._get_dbus_property("IsActive")
 
+        # Created by _load_children() when first needed
+        self._resolutions = None
+        self._buttons = None
+        self._leds = None
+        self._dirty_handlers = []
+
+    def _load_children(self):
+        # A client that only looks at devices and profiles shouldn't pay
+        # for a proxy per resolution, button and led, so these are only
+        # created on first access.
+        if self._resolutions is not None:
+            return
+
         # FIXME: if we start adding and removing objects from any of these
         # lists, things will break!
         result = self._get_dbus_property("Resolutions") or []
         self._resolutions = [RatbagdResolution(objpath) for objpath in result]
-        self._subscribe_dirty(self._resolutions)
 
         result = self._get_dbus_property("Buttons") or []
         self._buttons = [RatbagdButton(objpath) for objpath in result]
-        self._subscribe_dirty(self._buttons)
 
         result = self._get_dbus_property("Leds") or []
         self._leds = [RatbagdLed(objpath) for objpath in result]
-        self._subscribe_dirty(self._leds)
 
-    def _subscribe_dirty(self, objects):
-        for obj in objects:
-            obj.connect("notify", self._on_obj_notify)
+        for objects in (self._resolutions, self._buttons, self._leds):
+            for obj in objects:
+                obj._writes = self._writes
+                obj._profile = self
+
+        if not self._dirty:
+            self._subscribe_dirty()
+
+    def _subscribe_dirty(self):
+        # Once the profile is dirty the children's notifications don't change
+        # anything, so we only listen to them while the profile is clean.
+        if self._resolutions is None:
+            # Nothing to listen to until the children are created
+            return
+        for objects in (self._resolutions, self._buttons, self._leds):
+            for obj in objects:
+                handler = obj.connect("notify", self._on_obj_notify)
+                self._dirty_handlers.append((obj, handler))
+
+    def _unsubscribe_dirty(self):
+        for obj, handler in self._dirty_handlers:
+            obj.disconnect(handler)
+        self._dirty_handlers = []
 
     def _on_obj_notify(self, obj, pspec):
         if not self._dirty:
             self._dirty = True
+            self._unsubscribe_dirty()
+            self.notify("dirty")
+
+    def _clear_dirty(self):
+        self._dirty_confirmed = False
+        if self._dirty:
+            self._dirty = False
+            self._subscribe_dirty()
             self.notify("dirty")
 
+    def _confirm_dirty(self):
+        # A change to this profile or one of its children took effect
+        self._dirty_confirmed = True
+        self._on_obj_notify(None, None)
+
+    def _on_write_rejected(self):
+        # A rolled back write leaves the profile as it was, unless anything
+        # else changed meanwhile. Writes accepted later confirm it again.
+        if not self._dirty_confirmed:
+            self._clear_dirty()
+
     def _on_properties_changed(self, proxy, changed_props, invalidated_props):
-        if "IsActive" in changed_props.keys():
+        if "IsActive" in changed_props:
             active = changed_props["IsActive"]
             if active != self._active:
                 self._active = active
                 self.notify("is-active")
-                self._on_obj_notify(None, None)
+                self._confirm_dirty()
 
     @GObject.Property
     def capabilities(self):
-        """The capabilities of this profile as an array. Capabilities not
-        present on the profile are not in the list. Thus use e.g.
+        """The capabilities of this profile as a frozenset. Capabilities not
+        present on the profile are not in the set. Thus use e.g.
 
         if RatbagdProfile.CAP_WRITABLE_NAME in profile.capabilities:
             do something
         """
-        return self._get_dbus_property("Capabilities") or []
+        return self._capabilities
 
     @GObject.Property
     def name(self):
@@ -490,6 +770,7 @@ class RatbagdProfile(_RatbagdDBus):
         """A list of RatbagdResolution objects with this profile's resolutions.
         Note that the list of resolutions differs between profiles but the number
         of resolutions is identical across profiles."""
+        self._load_children()
         return self._resolutions
 
     @GObject.Property
@@ -498,6 +779,7 @@ class RatbagdProfile(_RatbagdDBus):
         property computed over the cached list of resolutions. In the unlikely
         case that your device driver is misconfigured and there is no active
         resolution, this returns the first resolution."""
+        self._load_children()
         for resolution in self._resolutions:
             if resolution.is_active:
                 return resolution
@@ -509,6 +791,7 @@ class RatbagdProfile(_RatbagdDBus):
         """A list of RatbagdButton objects with this profile's button mappings.
         Note that the list of buttons differs between profiles but the number
         of buttons is identical across profiles."""
+        self._load_children()
         return self._buttons
 
     @GObject.Property
@@ -516,6 +799,7 @@ class RatbagdProfile(_RatbagdDBus):
         """A list of RatbagdLed objects with this profile's leds. Note that the
         list of leds differs between profiles but the number of leds is
         identical across profiles."""
+        self._load_children()
         return self._leds
 
     @GObject.Property
@@ -529,26 +813,40 @@ class RatbagdProfile(_RatbagdDBus):
         self._set_dbus_property("IsActive", "b", True, readwrite=False)
         return ret
 
+    def set_active_async(self, callback):
+        """Like set_active(), but returns without waiting for ratbagd.
+        callback(result, error) is called from the thread-default main
+        context once ratbagd replied, with the return value of set_active()
+        or the exception it would have raised."""
+        def on_finished(result, error):
+            if error is None:
+                self._set_dbus_property("IsActive", "b", True, readwrite=False)
+            callback(result, error)
+
+        self._dbus_call_async(on_finished, "SetActive", "")
+
 
 class RatbagdResolution(_RatbagdDBus):
     """Represents a ratbagd resolution."""
 
+    _NOTIFY_ON_ROLLBACK = {
+        "Resolution": ("resolution",),
+    }
+
     def __init__(self, object_path):
         super().__init__("Resolution", object_path)
         self._active = self._get_dbus_property("IsActive")
         self._default = self._get_dbus_property("IsDefault")
 
     def _on_properties_changed(self, proxy, changed_props, invalidated_props):
-        if "IsActive" in changed_props.keys():
-            active = changed_props["IsActive"]
-            if active != self._active:
-                self._active = active
-                self.notify("is-active")
-        elif "IsDefault" in changed_props.keys():
-            default = changed_props["IsDefault"]
-            if default != self._default:
-                self._default = default
-                self.notify("is-default")
+        active = changed_props.get("IsActive", self._active)
+        if active != self._active:
+            self._active = active
+            self.notify("is-active")
+        default = changed_props.get("IsDefault", self._default)
+        if default != self._default:
+            self._default = default
+            self.notify("is-default")
 
     @GObject.Property
     def index(self):
@@ -603,16 +901,40 @@ class RatbagdResolution(_RatbagdDBus):
         self._set_dbus_property("IsDefault", "b", True, readwrite=False)
         return ret
 
+    def set_default_async(self, callback):
+        """Like set_default(), but asynchronous, see
+        RatbagdProfile.set_active_async()."""
+        def on_finished(result, error):
+            if error is None:
+                self._set_dbus_property("IsDefault", "b", True, readwrite=False)
+            callback(result, error)
+
+        self._dbus_call_async(on_finished, "SetDefault", "")
+
     def set_active(self):
         """Set this resolution to be the active one."""
         ret = self._dbus_call("SetActive", "")
         self._set_dbus_property("IsActive", "b", True, readwrite=False)
         return ret
 
+    def set_active_async(self, callback):
+        """Like set_active(), but asynchronous, see
+        RatbagdProfile.set_active_async()."""
+        def on_finished(result, error):
+            if error is None:
+                self._set_dbus_property("IsActive", "b", True, readwrite=False)
+            callback(result, error)
+
+        self._dbus_call_async(on_finished, "SetActive", "")
+
 
 class RatbagdButton(_RatbagdDBus):
     """Represents a ratbagd button."""
 
+    _NOTIFY_ON_ROLLBACK = {
+        "Mapping": ("mapping", "macro", "special", "action-type"),
+    }
+
     class ActionType(IntEnum):
         NONE = 0
         BUTTON = 1
@@ -685,7 +1007,7 @@ class RatbagdButton(_RatbagdDBus):
         super().__init__("Button", object_path)
 
     def _on_properties_changed(self, proxy, changed_props, invalidated_props):
-        if "Mapping" in changed_props.keys():
+        if "Mapping" in changed_props:
             self.notify("action-type")
 
     def _mapping(self):
@@ -783,20 +1105,6 @@ class RatbagdMacro(GObject.Object):
     # All keys from ecodes.KEY have a KEY_ prefix. We strip it.
     _PREFIX_LEN = len("KEY_")
 
-    # Both a key press and release.
-    _MACRO_KEY = 1000
-
-    _MACRO_DESCRIPTION = {
-        RatbagdButton.Macro.KEY_PRESS: lambda key:
-            "↓{}".format(ecodes.KEY[key][RatbagdMacro._PREFIX_LEN:]),
-        RatbagdButton.Macro.KEY_RELEASE: lambda key:
-            "↑{}".format(ecodes.KEY[key][RatbagdMacro._PREFIX_LEN:]),
-        RatbagdButton.Macro.WAIT: lambda val:
-            "{}ms".format(val),
-        _MACRO_KEY: lambda key:
-            "↕{}".format(ecodes.KEY[key][RatbagdMacro._PREFIX_LEN:]),
-    }
-
     __gsignals__ = {
         'macro-set': (GObject.SignalFlags.RUN_FIRST, None, ()),
     }
@@ -810,21 +1118,29 @@ class RatbagdMacro(GObject.Object):
             # Translators: this is used when there is no macro to preview.
             return _("None")
 
+        macro = self._macro
+        n = len(macro)
+        key_names = ecodes.KEY
+        prefix_len = self._PREFIX_LEN
         keys = []
         idx = 0
-        while idx < len(self._macro):
-            t, v = self._macro[idx]
-            try:
-                if t == RatbagdButton.Macro.KEY_PRESS:
-                    # Check for a paired press/release event
-                    t2, v2 = self._macro[idx + 1]
-                    if t2 == RatbagdButton.Macro.KEY_RELEASE and v == v2:
-                        t = self._MACRO_KEY
-                        idx += 1
-            except IndexError:
-                pass
-            keys.append(self._MACRO_DESCRIPTION[t](v))
+        while idx < n:
+            t, v = macro[idx]
             idx += 1
+            if t == RatbagdButton.Macro.KEY_PRESS:
+                # A press directly followed by its release is shown as a
+                # single key stroke
+                if idx < n and macro[idx] == (RatbagdButton.Macro.KEY_RELEASE, v):
+                    keys.append(f"↕{key_names[v][prefix_len:]}")
+                    idx += 1
+                else:
+                    keys.append(f"↓{key_names[v][prefix_len:]}")
+            elif t == RatbagdButton.Macro.KEY_RELEASE:
+                keys.append(f"↑{key_names[v][prefix_len:]}")
+            elif t == RatbagdButton.Macro.WAIT:
+                keys.append(f"{v}ms")
+            else:
+                raise KeyError(t)
         return " ".join(keys)
 
     @GObject.Property
@@ -877,6 +1193,13 @@ class RatbagdLed(_RatbagdDBus):
     TYPE_DPI = 4
     TYPE_WHEEL = 5
 
+    _NOTIFY_ON_ROLLBACK = {
+        "Mode": ("mode",),
+        "Color": ("color",),
+        "EffectDuration": ("effect-duration",),
+        "Brightness": ("brightness",),
+    }
+
     class Mode(IntEnum):
         OFF = 0
         ON = 1